@@ -28,32 +28,52 @@ import io
 import zlib
 import html
 import json
+import itertools
+import hashlib
+import tempfile
+import types
+import functools
+import copy
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape as xml_escape
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
 import argparse
 
 VERSION = "1.0.0"
 CREDITS = "Developed by JINDE (NIK Co., Ltd.) / 株式会社ニッキ 神出"
 
-# Try to import ReportLab for PDF support
-try:
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, Table as RLTable, TableStyle, PageBreak, Preformatted
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch, mm
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from reportlab.graphics.shapes import Drawing, Line
-    HAS_REPORTLAB = True
-
-except ImportError:
-    HAS_REPORTLAB = False
-
+# 解析用の正規表現 (行ごとに再解析しないようモジュール読み込み時にコンパイル)
+_BOLD_RE = re.compile(r'(\*\*.*?\*\*)')
+_IMAGE_RE = re.compile(r'!\[(.*?)\]\((.*?)\)')
+# 番号付きリストは従来どおり str.isdigit() で判定するため含めない (\d は '²' などに一致しない)
+_BLOCK_RE = re.compile(r'^(?P<h>#{1,4}) |^(?P<ul>[*-]) |^(?P<q>>) |^(?P<img>!\[)')
+# 見出し・リスト・引用・画像になり得る先頭文字 (これ以外で始まり数字でもない行は通常の段落)
+_BLOCK_FIRST_CHARS = frozenset('#*->!')
+
+# タブ展開用の変換表
+_TAB_TRANS = str.maketrans({'\t': '    '})
+
+# PDFコードブロック用の変換表 (タブ展開・HTMLエスケープ・&nbsp;化を1回の走査で行う)
+_CODE_TRANS = str.maketrans({
+    '\t': '&nbsp;&nbsp;&nbsp;&nbsp;',
+    ' ': '&nbsp;',
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+@functools.lru_cache(maxsize=1)
 def load_config():
+    # 設定は実行中に変わらないため、読み込み結果を共有する (Writerを複数生成しても再読込しない)
     config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file (config.json) not found at: {config_path}")
@@ -64,44 +84,93 @@ def load_config():
     except Exception as e:
         raise RuntimeError(f"Error loading config.json: {e}")
 
+# よく使う属性名 (名前空間付き) は呼び出し毎に qn() で解決せず定数化しておく
+_QN_VAL = qn('w:val')
+_QN_SZ = qn('w:sz')
+_QN_EA = qn('w:eastAsia')
+_QN_COLOR = qn('w:color')
+_QN_SPACE = qn('w:space')
+_QN_W = qn('w:w')
+_QN_TYPE = qn('w:type')
+
+# セルの罫線 (上下左右) のひな形
+# セル毎に要素を組み立てず、パース済みの要素を複製して使う
+_TCBORDERS_XML = (
+    f'<w:tcBorders {nsdecls("w")}>'
+    '<w:top w:val="single" w:sz="4"/>'
+    '<w:left w:val="single" w:sz="4"/>'
+    '<w:bottom w:val="single" w:sz="4"/>'
+    '<w:right w:val="single" w:sz="4"/>'
+    '</w:tcBorders>'
+)
+_TCBORDERS_TEMPLATE = parse_xml(_TCBORDERS_XML)
+
+# 表全体の罫線 (外枠と内側の縦横線) のひな形
+_TBLBORDERS_XML = (
+    f'<w:tblBorders {nsdecls("w")}>'
+    '<w:top w:val="single" w:sz="4"/>'
+    '<w:left w:val="single" w:sz="4"/>'
+    '<w:bottom w:val="single" w:sz="4"/>'
+    '<w:right w:val="single" w:sz="4"/>'
+    '<w:insideH w:val="single" w:sz="4"/>'
+    '<w:insideV w:val="single" w:sz="4"/>'
+    '</w:tblBorders>'
+)
+_TBLBORDERS_TEMPLATE = parse_xml(_TBLBORDERS_XML)
+
 def add_table_borders(table):
     tbl = table._tbl
     for cell in tbl.iter_tcs():
-        tcPr = cell.tcPr
-        tcBorders = OxmlElement('w:tcBorders')
-        top = OxmlElement('w:top')
-        top.set(qn('w:val'), 'single')
-        top.set(qn('w:sz'), '4')
-        
-        left = OxmlElement('w:left')
-        left.set(qn('w:val'), 'single')
-        left.set(qn('w:sz'), '4')
-        
-        bottom = OxmlElement('w:bottom')
-        bottom.set(qn('w:val'), 'single')
-        bottom.set(qn('w:sz'), '4')
-        
-        right = OxmlElement('w:right')
-        right.set(qn('w:val'), 'single')
-        right.set(qn('w:sz'), '4')
-        
-        tcBorders.append(top)
-        tcBorders.append(left)
-        tcBorders.append(bottom)
-        tcBorders.append(right)
-        tcPr.append(tcBorders)
+        cell.get_or_add_tcPr().append(copy.deepcopy(_TCBORDERS_TEMPLATE))
+
+def add_table_borders_whole(table):
+    """表全体に罫線を設定 (セル毎に設定するより要素数が少なく済む)"""
+    tblPr = table._tbl.tblPr
+    # スキーマ上の順序 (tblBorders は shd/tblLayout/tblCellMar/tblLook より前) を守って挿入する
+    tblPr.insert_element_before(
+        copy.deepcopy(_TBLBORDERS_TEMPLATE),
+        'w:shd', 'w:tblLayout', 'w:tblCellMar', 'w:tblLook',
+        'w:tblCaption', 'w:tblDescription', 'w:tblPrChange'
+    )
+
+# python-docx 既定テンプレートの内容 (Writer毎にテンプレートを開き直さないよう初回のみ読み込む)
+_BLANK_DOCX_BYTES = None
+_BLANK_DOCX_LOCK = threading.Lock()
+
+def _new_document():
+    """既定テンプレートから新しい空の Document を作成"""
+    global _BLANK_DOCX_BYTES
+    with _BLANK_DOCX_LOCK:
+        if _BLANK_DOCX_BYTES is None:
+            buf = io.BytesIO()
+            Document().save(buf)
+            _BLANK_DOCX_BYTES = buf.getvalue()
+    return Document(io.BytesIO(_BLANK_DOCX_BYTES))
 
 class DocxWriter:
     def __init__(self):
-        self.doc = Document()
+        self.doc = _new_document()
         self.config = load_config()
         fonts = self.config['fonts']
 
+        # Run毎に生成しないよう、コード/太字のフォント属性を事前に計算しておく
+        self._code_font_name = fonts['code']['docx_name']
+        self._code_color = RGBColor(*fonts['code']['colors'])
+        self._code_size = Pt(fonts['code']['size'])
+        self._bold_color = RGBColor(*fonts['bold']['colors'])
+        # コードブロックのRun書式 (XML断片として一括生成する際に使用)
+        code_name_attr = xml_escape(self._code_font_name, {'"': '&quot;'})
+        self._code_rpr_xml = (
+            f'<w:rPr><w:rFonts w:ascii="{code_name_attr}" w:hAnsi="{code_name_attr}"/>'
+            f'<w:color w:val="{self._code_color}"/>'
+            f'<w:sz w:val="{int(self._code_size.pt * 2)}"/></w:rPr>'
+        )
+
         # スタイルの調整 (ゴシック系フォントの設定)
         style = self.doc.styles['Normal']
         font = style.font
         font.name = fonts['normal']['name']
-        font.element.rPr.rFonts.set(qn('w:eastAsia'), fonts['normal']['eastAsia'])
+        font.element.rPr.rFonts.set(_QN_EA, fonts['normal']['eastAsia'])
         font.size = Pt(fonts['normal']['size'])
         
         # 見出しのサイズ設定
@@ -115,7 +184,7 @@ class DocxWriter:
                 h_style = self.doc.styles[f'Heading {i}']
                 h_font = h_style.font
                 h_font.name = h_name
-                h_font.element.rPr.rFonts.set(qn('w:eastAsia'), h_eastAsia)
+                h_font.element.rPr.rFonts.set(_QN_EA, h_eastAsia)
                 h_font.size = Pt(size)
                 # 見出しを目立たせる色設定
                 h_font.color.rgb = RGBColor(*h_color)
@@ -126,15 +195,16 @@ class DocxWriter:
 
     def process_inline_formatting(self, paragraph, text):
         """行内のフォーマット（**太字**）を解析してParagraphに追加"""
-        text = text.replace('<br>', '\n')
-        parts = re.split(r'(\*\*.*?\*\*)', text)
-        bold_color = self.config['fonts']['bold']['colors']
+        if '<br>' in text:
+            text = text.replace('<br>', '\n')
+        parts = _BOLD_RE.split(text)
+        bold_color = self._bold_color
         for part in parts:
             if part.startswith('**') and part.endswith('**') and len(part) >= 4:
                 run = paragraph.add_run(part[2:-2])
                 run.bold = True
                 # 太字を色変更して通常の太字と区別
-                run.font.color.rgb = RGBColor(*bold_color)
+                run.font.color.rgb = bold_color
             else:
                 if part:
                     paragraph.add_run(part)
@@ -151,14 +221,14 @@ class DocxWriter:
             pPr = h._p.get_or_add_pPr()
             pBdr = OxmlElement('w:pBdr')
             bottom = OxmlElement('w:bottom')
-            bottom.set(qn('w:val'), 'single')
-            bottom.set(qn('w:sz'), '6') # 0.75pt
-            bottom.set(qn('w:space'), '1')
+            bottom.set(_QN_VAL, 'single')
+            bottom.set(_QN_SZ, '6') # 0.75pt
+            bottom.set(_QN_SPACE, '1')
             
             # 見出し色を取得して線に適用
             h_rgb = self.config['fonts']['heading']['colors']
             hex_color = '{:02x}{:02x}{:02x}'.format(*h_rgb)
-            bottom.set(qn('w:color'), hex_color)
+            bottom.set(_QN_COLOR, hex_color)
             
             pBdr.append(bottom)
             pPr.append(pBdr)
@@ -174,10 +244,9 @@ class DocxWriter:
         p = self.doc.add_paragraph(style=style)
         self.process_inline_formatting(p, text)
         if style == 'No Spacing': # Code block style adjustments
-            code_cfg = self.config['fonts']['code']
             for run in p.runs:
-                run.font.name = code_cfg['docx_name']
-                run.font.color.rgb = RGBColor(*code_cfg['colors'])
+                run.font.name = self._code_font_name
+                run.font.color.rgb = self._code_color
         return p
 
     def add_quote(self, text):
@@ -202,7 +271,7 @@ class DocxWriter:
                     p = cell.paragraphs[0]
                     p.text = ""
                     self.process_inline_formatting(p, text)
-        add_table_borders(table) # Optional custom borders
+        add_table_borders_whole(table) # Optional custom borders
         self.doc.add_paragraph()
 
     def add_page_break(self):
@@ -222,8 +291,8 @@ class DocxWriter:
         # 表全体のインデント設定
         tblPr = table._tbl.tblPr
         tblInd = OxmlElement('w:tblInd')
-        tblInd.set(qn('w:w'), '400') # 20pt (1pt = 20dxa)
-        tblInd.set(qn('w:type'), 'dxa')
+        tblInd.set(_QN_W, '400') # 20pt (1pt = 20dxa)
+        tblInd.set(_QN_TYPE, 'dxa')
         tblPr.append(tblInd)
         
         add_table_borders(table)
@@ -235,26 +304,77 @@ class DocxWriter:
         p.paragraph_format.space_before = Pt(2)
         p.paragraph_format.space_after = Pt(2)
         
-        # フォント設定
-        code_cfg = self.config['fonts']['code']
-        
-        # 行ごとにRunを追加して強制改行を入れる
+        # 行ごとにRunを作って強制改行を入れる
+        # add_run() を行数分呼ぶと遅いため、全Runを1つのXML断片として組み立てて一括で追加する
+        rpr = self._code_rpr_xml
+        last = len(lines) - 1
+        runs = []
         for i, line in enumerate(lines):
             # Tabをスペースに置換
-            text = line.replace('\t', '    ')
+            text = line.translate(_TAB_TRANS)
             
-            # DocxではHTMLエスケープや&nbsp;置換は不要
-            run = p.add_run(text)
-            run.font.name = code_cfg['docx_name']
-            run.font.color.rgb = RGBColor(*code_cfg['colors'])
-            run.font.size = Pt(code_cfg['size'])
-            
-            if i < len(lines) - 1:
-                run.add_break()
+            t = ''
+            if text:
+                # 前後の空白を保持する (python-docx の Run.text と同じ判定)
+                space = ' xml:space="preserve"' if len(text.strip()) < len(text) else ''
+                t = f'<w:t{space}>{xml_escape(text)}</w:t>'
+            br = '<w:br/>' if i < last else ''
+            runs.append(f'<w:r>{rpr}{t}{br}</w:r>')
+        
+        fragment = parse_xml(f'<w:p {nsdecls("w")}>{"".join(runs)}</w:p>')
+        p._p.extend(list(fragment))
+
+def _bold_to_markup(text, bold_hex):
+    """**Bold** -> <b>Bold</b> (着色) に変換"""
+    i = text.find('**')
+    if i == -1:
+        return text
+
+    open_tag = f'<font color="{bold_hex}"><b>'
+    close_tag = '</b></font>'
+    out = []
+    pos = 0
+    while i != -1:
+        j = text.find('**', i + 2)
+        if j == -1:
+            break
+        if text.find('\n', i + 2, j) != -1:
+            # 改行をまたぐ組は対象外 (次の ** から探し直す)
+            i = text.find('**', i + 1)
+            continue
+        out.append(text[pos:i])
+        out.append(open_tag)
+        out.append(text[i + 2:j])
+        out.append(close_tag)
+        pos = j + 2
+        i = text.find('**', pos)
+    out.append(text[pos:])
+    return ''.join(out)
+
+@functools.lru_cache(maxsize=4096)
+def _format_text_cached(text, bold_hex):
+    """Markdownの太字などをReportLabのXMLタグに変換 (表のセルなど同じ文字列が多いため結果をキャッシュ)"""
+    text = html.escape(text)
+    text = text.replace('&lt;br&gt;', '<br/>')
+    
+    # タブ文字の置換はここで行わず、呼び出し元で制御する
+
+    return _bold_to_markup(text, bold_hex)
 
 class PdfWriter:
     def __init__(self):
-        if not HAS_REPORTLAB:
+        # ReportLab はPDF出力時のみ必要なため、ここで読み込む (Docx変換の起動を軽くする)
+        try:
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, Table as RLTable, TableStyle, PageBreak
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib import colors
+            from reportlab.lib.units import inch
+            from reportlab.lib.fonts import addMapping
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+            from reportlab.graphics.shapes import Drawing, Line
+        except ImportError:
             print("\n" + "="*60)
             print(" ERROR: ReportLab library is missing.")
             print(" To generate PDF, please install 'reportlab'.")
@@ -264,9 +384,16 @@ class PdfWriter:
             print("     pip install reportlab --break-system-packages")
             print("="*60 + "\n")
             raise ImportError("ReportLab is not installed. Cannot generate PDF.")
+        self._rl = types.SimpleNamespace(
+            SimpleDocTemplate=SimpleDocTemplate, Paragraph=Paragraph, Spacer=Spacer,
+            RLImage=RLImage, RLTable=RLTable, TableStyle=TableStyle, PageBreak=PageBreak,
+            getSampleStyleSheet=getSampleStyleSheet, ParagraphStyle=ParagraphStyle,
+            A4=A4, colors=colors, inch=inch, addMapping=addMapping,
+            pdfmetrics=pdfmetrics, TTFont=TTFont, Drawing=Drawing, Line=Line,
+        )
         self.config = load_config()
         self.story = []
-        self.styles = getSampleStyleSheet()
+        self.styles = self._rl.getSampleStyleSheet()
         self.setup_fonts()
         
         # Define styles
@@ -278,58 +405,52 @@ class PdfWriter:
         self.normal_style.leading = fonts['normal']['size'] * 1.4
         
         c_rgb = fonts['code']['colors']
-        c_color = colors.Color(c_rgb[0]/255.0, c_rgb[1]/255.0, c_rgb[2]/255.0)
+        self._code_rl_color = self._rl.colors.Color(c_rgb[0]/255.0, c_rgb[1]/255.0, c_rgb[2]/255.0)
+        self._bold_hex = '#{:02x}{:02x}{:02x}'.format(*fonts['bold']['colors'])
 
-        self.code_style = ParagraphStyle('Code', parent=self.styles['Normal'], 
+        self.code_style = self._rl.ParagraphStyle('Code', parent=self.styles['Normal'], 
                                          fontName=fonts['code']['pdf_name'], 
                                          fontSize=fonts['code']['size'], 
-                                         textColor=c_color)
-        self.quote_style = ParagraphStyle('Quote', parent=self.styles['Normal'], fontName='JapaneseFont', leftIndent=20, textColor=colors.darkgrey)
+                                         textColor=self._code_rl_color)
+        self.quote_style = self._rl.ParagraphStyle('Quote', parent=self.styles['Normal'], fontName='JapaneseFont', leftIndent=20, textColor=self._rl.colors.darkgrey)
+        self.bullet_style = self._rl.ParagraphStyle('Bullet', parent=self.normal_style, leftIndent=10)
+        self.number_style = self._rl.ParagraphStyle('Number', parent=self.normal_style, leftIndent=10)
+        # 見出しスタイルは (レベル, 改ページ有無) ごとに1度だけ作成して使い回す
+        self._heading_styles = {}
 
     def add_code_block(self, lines):
         if not lines:
             return
 
-        formatted_lines = []
-        for line in lines:
-            line = line.replace('\t', '    ') 
-            line = html.escape(line)
-            line = line.replace(' ', '&nbsp;') 
-            formatted_lines.append(line)
-        
-        full_text = '<br/>'.join(formatted_lines)
-        
-        c_rgb = self.config['fonts']['code']['colors']
-        c_color = colors.Color(c_rgb[0]/255.0, c_rgb[1]/255.0, c_rgb[2]/255.0)
+        full_text = '<br/>'.join(line.translate(_CODE_TRANS) for line in lines)
         
-        block_style = ParagraphStyle(
+        block_style = self._rl.ParagraphStyle(
             'CodeBlock',
             parent=self.styles['Normal'],
             fontName=self.config['fonts']['code']['pdf_name'],
             fontSize=self.config['fonts']['code']['size'],
-            textColor=c_color,
+            textColor=self._code_rl_color,
             leading=self.config['fonts']['code']['size'] * 1.4,
             leftIndent=20,    # 左インデント追加
             rightIndent=20,   # 右インデント追加
             borderWidth=0.5,
-            borderColor=colors.black,
+            borderColor=self._rl.colors.black,
             borderPadding=6,
-            backColor=colors.whitesmoke,
+            backColor=self._rl.colors.whitesmoke,
             splitLongWords=False
         )
         
         # 枠線の外側に空白を追加（前）
-        self.story.append(Spacer(1, 0.15*inch))
-        self.story.append(Paragraph(full_text, block_style))
+        self.story.append(self._rl.Spacer(1, 0.15*self._rl.inch))
+        self.story.append(self._rl.Paragraph(full_text, block_style))
         # 枠線の外側に空白を追加（後）
-        self.story.append(Spacer(1, 0.15*inch))
+        self.story.append(self._rl.Spacer(1, 0.15*self._rl.inch))
 
     def setup_fonts(self):
         # 日本語フォントの検索と登録
         font_paths = self.config.get('pdf_font_paths', [])
         
         registered = False
-        from reportlab.lib.fonts import addMapping
 
         for p in font_paths:
             if not os.path.exists(p):
@@ -339,22 +460,22 @@ class PdfWriter:
                 # フォントの読み込み試行（TTC対応）
                 # 太字(Bold)・斜体(Italic)も同じフォントファイルを割り当てて、エラー("Can't map")を回避する
                 if p.endswith('.ttc'):
-                    pdfmetrics.registerFont(TTFont('JapaneseFont', p, subfontIndex=0))
-                    pdfmetrics.registerFont(TTFont('JapaneseFont-Bold', p, subfontIndex=0))
-                    pdfmetrics.registerFont(TTFont('JapaneseFont-Italic', p, subfontIndex=0))
-                    pdfmetrics.registerFont(TTFont('JapaneseFont-BoldItalic', p, subfontIndex=0))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont', p, subfontIndex=0))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont-Bold', p, subfontIndex=0))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont-Italic', p, subfontIndex=0))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont-BoldItalic', p, subfontIndex=0))
                 else:
-                    pdfmetrics.registerFont(TTFont('JapaneseFont', p))
-                    pdfmetrics.registerFont(TTFont('JapaneseFont-Bold', p))
-                    pdfmetrics.registerFont(TTFont('JapaneseFont-Italic', p))
-                    pdfmetrics.registerFont(TTFont('JapaneseFont-BoldItalic', p))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont', p))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont-Bold', p))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont-Italic', p))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont-BoldItalic', p))
                 
                 # スタイルマッピング (Normal, Bold, Italic, BoldItalic)
                 # これにより <b>タグなどが来てもクラッシュせず Regular フォントで表示される
-                addMapping('JapaneseFont', 0, 0, 'JapaneseFont')            # Normal
-                addMapping('JapaneseFont', 0, 1, 'JapaneseFont-Italic')     # Italic
-                addMapping('JapaneseFont', 1, 0, 'JapaneseFont-Bold')       # Bold
-                addMapping('JapaneseFont', 1, 1, 'JapaneseFont-BoldItalic') # BoldItalic
+                self._rl.addMapping('JapaneseFont', 0, 0, 'JapaneseFont')            # Normal
+                self._rl.addMapping('JapaneseFont', 0, 1, 'JapaneseFont-Italic')     # Italic
+                self._rl.addMapping('JapaneseFont', 1, 0, 'JapaneseFont-Bold')       # Bold
+                self._rl.addMapping('JapaneseFont', 1, 1, 'JapaneseFont-BoldItalic') # BoldItalic
                 
                 registered = True
                 print(f"Loaded font: {p}")
@@ -369,7 +490,6 @@ class PdfWriter:
 
     def setup_fallback_font(self):
         print("Warning: Japanese font not found. Characters may not display correctly.")
-        from reportlab.lib.fonts import addMapping
         # 日本語が出なくてもクラッシュを防ぐため、システムにある英字フォントで代用登録を試みる
         fallback_paths = [
             "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
@@ -378,26 +498,22 @@ class PdfWriter:
         for p in fallback_paths:
             if os.path.exists(p):
                 try:
-                    pdfmetrics.registerFont(TTFont('JapaneseFont', p))
+                    self._rl.pdfmetrics.registerFont(self._rl.TTFont('JapaneseFont', p))
                     # Fallbackでもマッピングしておく
-                    addMapping('JapaneseFont', 0, 0, 'JapaneseFont')
-                    addMapping('JapaneseFont', 1, 0, 'JapaneseFont')
+                    self._rl.addMapping('JapaneseFont', 0, 0, 'JapaneseFont')
+                    self._rl.addMapping('JapaneseFont', 1, 0, 'JapaneseFont')
                     return
                 except:
                     continue
 
+    @classmethod
+    def clear_cache(cls):
+        """_format_text の変換結果キャッシュを破棄 (設定を変更した場合など)"""
+        _format_text_cached.cache_clear()
+
     def _format_text(self, text):
         """Markdownの太字などをReportLabのXMLタグに変換"""
-        text = html.escape(text)
-        text = text.replace('&lt;br&gt;', '<br/>')
-        
-        # タブ文字の置換はここで行わず、呼び出し元で制御する
-
-        # **Bold** -> <b>Bold</b> (着色)
-        b_rgb = self.config['fonts']['bold']['colors']
-        hex_color = '#{:02x}{:02x}{:02x}'.format(*b_rgb)
-        text = re.sub(r'\*\*(.*?)\*\*', f'<font color="{hex_color}"><b>\\1</b></font>', text)
-        return text
+        return _format_text_cached(text, self._bold_hex)
 
     def add_heading(self, text, level):
         h_cfg = self.config['fonts']['heading']
@@ -412,29 +528,32 @@ class PdfWriter:
         use_page_break = (level <= break_level and len(self.story) > 0)
         
         h_rgb = h_cfg['colors']
-        h_color = colors.Color(h_rgb[0]/255.0, h_rgb[1]/255.0, h_rgb[2]/255.0)
+        h_color = self._rl.colors.Color(h_rgb[0]/255.0, h_rgb[1]/255.0, h_rgb[2]/255.0)
 
         # 見出しを目立たせる
-        style = ParagraphStyle(
-            f'H{level}', 
-            parent=self.styles['Normal'], 
-            fontName='JapaneseFont', 
-            fontSize=size, 
-            leading=size*1.2, 
-            spaceAfter=6, 
-            textColor=h_color,
-            pageBreakBefore=use_page_break
-        )
-        self.story.append(Paragraph(self._format_text(text), style))
+        style = self._heading_styles.get((level, use_page_break))
+        if style is None:
+            style = self._rl.ParagraphStyle(
+                f'H{level}', 
+                parent=self.styles['Normal'], 
+                fontName='JapaneseFont', 
+                fontSize=size, 
+                leading=size*1.2, 
+                spaceAfter=6, 
+                textColor=h_color,
+                pageBreakBefore=use_page_break
+            )
+            self._heading_styles[(level, use_page_break)] = style
+        self.story.append(self._rl.Paragraph(self._format_text(text), style))
 
         # 見出しの下に線を追加 (H1, H2のみ)
         if level <= 2:
             # 描画エリアの幅 (A4 width - margins)
-            width = A4[0] - 144
-            d = Drawing(width, 10)
-            d.add(Line(0, 5, width, 5, strokeColor=h_color, strokeWidth=1))
+            width = self._rl.A4[0] - 144
+            d = self._rl.Drawing(width, 10)
+            d.add(self._rl.Line(0, 5, width, 5, strokeColor=h_color, strokeWidth=1))
             self.story.append(d)
-            self.story.append(Spacer(1, 0.1*inch))
+            self.story.append(self._rl.Spacer(1, 0.1*self._rl.inch))
 
     def add_paragraph(self, text, style=None):
         pst = self.normal_style
@@ -444,38 +563,38 @@ class PdfWriter:
             is_code = True
         elif style == 'List Bullet':
             text = f"• {text}"
-            pst = ParagraphStyle('Bullet', parent=self.normal_style, leftIndent=10)
+            pst = self.bullet_style
         elif style == 'List Number':
-            pst = ParagraphStyle('Number', parent=self.normal_style, leftIndent=10)
+            pst = self.number_style
         
         # コードブロックの場合のみタブとスペースを置換
         if is_code:
-            text = text.replace('\t', '    ') # タブをスペース4つに
+            text = text.translate(_TAB_TRANS) # タブをスペース4つに
             formatted_text = self._format_text(text)
             formatted_text = formatted_text.replace(' ', '&nbsp;') # スペースを維持用タグに
         else:
             formatted_text = self._format_text(text)
 
-        self.story.append(Paragraph(formatted_text, pst))
+        self.story.append(self._rl.Paragraph(formatted_text, pst))
         if style != 'No Spacing':
-            self.story.append(Spacer(1, 0.1*inch))
+            self.story.append(self._rl.Spacer(1, 0.1*self._rl.inch))
 
     def add_quote(self, text):
-        self.story.append(Paragraph(self._format_text(text), self.quote_style))
-        self.story.append(Spacer(1, 0.1*inch))
+        self.story.append(self._rl.Paragraph(self._format_text(text), self.quote_style))
+        self.story.append(self._rl.Spacer(1, 0.1*self._rl.inch))
 
     def add_image(self, image_data, width_inches=5):
         # image_data can be path (str) or bytes stream
         try:
-            img = RLImage(image_data)
+            img = self._rl.RLImage(image_data)
             # Resize logic simplistic
             aspect = img.imageHeight / float(img.imageWidth)
-            disp_width = width_inches * inch
+            disp_width = width_inches * self._rl.inch
             disp_height = disp_width * aspect
             img.drawHeight = disp_height
             img.drawWidth = disp_width
             self.story.append(img)
-            self.story.append(Spacer(1, 0.2*inch))
+            self.story.append(self._rl.Spacer(1, 0.2*self._rl.inch))
         except Exception as e:
             print(f"Image error: {e}")
 
@@ -485,152 +604,268 @@ class PdfWriter:
         for row in data:
             row_cells = []
             for cell_text in row:
-                row_cells.append(Paragraph(self._format_text(cell_text), self.normal_style))
+                row_cells.append(self._rl.Paragraph(self._format_text(cell_text), self.normal_style))
             tbl_data.append(row_cells)
         
-        t = RLTable(tbl_data, colWidths=[(6.0/cols)*inch]*cols)
-        t.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        t = self._rl.RLTable(tbl_data, colWidths=[(6.0/cols)*self._rl.inch]*cols)
+        t.setStyle(self._rl.TableStyle([
+            ('GRID', (0,0), (-1,-1), 0.5, self._rl.colors.black),
             ('VALIGN', (0,0), (-1,-1), 'TOP'),
         ]))
         self.story.append(t)
-        self.story.append(Spacer(1, 0.2*inch))
+        self.story.append(self._rl.Spacer(1, 0.2*self._rl.inch))
 
     def add_page_break(self):
-        self.story.append(PageBreak())
+        self.story.append(self._rl.PageBreak())
 
     def save(self, path):
-        doc = SimpleDocTemplate(path, pagesize=A4,
+        doc = self._rl.SimpleDocTemplate(path, pagesize=self._rl.A4,
                             rightMargin=72, leftMargin=72,
                             topMargin=72, bottomMargin=18)
         doc.build(self.story)
         print(f"PDF file created: {path}")
 
-def convert_markdown(md_path, output_path, writer_class=DocxWriter):
-    writer = writer_class()
-    
-    with open(md_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+# 変換済みMermaid画像のキャッシュ (キー -> (有効期限, PNG))
+# 同じ図は一定時間再取得しない。取得はスレッドから行うためロックで保護する
+_MERMAID_CACHE = collections.OrderedDict()
+_MERMAID_CACHE_MAXSIZE = 64
+_MERMAID_CACHE_TTL = 3600 # 秒
+_MERMAID_CACHE_LOCK = threading.Lock()
+
+def _mermaid_cache_get(key):
+    with _MERMAID_CACHE_LOCK:
+        entry = _MERMAID_CACHE.get(key)
+        if entry is None:
+            return None
+        expires, png = entry
+        if expires < time.monotonic():
+            del _MERMAID_CACHE[key]
+            return None
+        _MERMAID_CACHE.move_to_end(key)
+        return png
+
+def _mermaid_cache_put(key, png):
+    with _MERMAID_CACHE_LOCK:
+        _MERMAID_CACHE[key] = (time.monotonic() + _MERMAID_CACHE_TTL, png)
+        _MERMAID_CACHE.move_to_end(key)
+        while len(_MERMAID_CACHE) > _MERMAID_CACHE_MAXSIZE:
+            _MERMAID_CACHE.popitem(last=False)
+
+# 変換済みMermaid画像のディスクキャッシュ (再実行時にネットワークアクセスを省く)
+_MERMAID_DISK_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'md2docx')
+
+def _read_mermaid_disk_cache(key):
+    try:
+        with open(os.path.join(_MERMAID_DISK_CACHE_DIR, f'{key}.png'), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
 
-    # 末尾が改行で終わっていない場合にバッファ（表など）がフラッシュされない問題への対策
-    # 強制的に空行を追加することで、ループの最後でelseブロック（フラッシュ処理）に入るようにする
-    lines.append("")
+def _write_mermaid_disk_cache(key, png):
+    # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+    try:
+        os.makedirs(_MERMAID_DISK_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=_MERMAID_DISK_CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, os.path.join(_MERMAID_DISK_CACHE_DIR, f'{key}.png'))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Mermaid cache write error: {e}")
+
+def fetch_mermaid_png(mermaid_lines):
+    """MermaidのコードをKroki (kroki.io) でPNGに変換し、バイト列を返す"""
+    mm_bytes = '\n'.join(mermaid_lines).encode('utf-8')
+    key = hashlib.sha256(mm_bytes).hexdigest()
+
+    png = _mermaid_cache_get(key)
+    if png is not None:
+        return png
+
+    png = _read_mermaid_disk_cache(key)
+    if png is None:
+        # 小さな図は圧縮率の差がほとんど無いため、高速なレベル1で圧縮する
+        mm_compressed = zlib.compress(mm_bytes, 1 if len(mm_bytes) < 256 else 6)
+        mm_b64 = base64.urlsafe_b64encode(mm_compressed).decode('ascii')
+        url = f"https://kroki.io/mermaid/png/{mm_b64}"
+        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        with urllib.request.urlopen(req) as response:
+            png = response.read()
+        _write_mermaid_disk_cache(key, png)
+    _mermaid_cache_put(key, png)
+    return png
+
+class _OrderedWriter:
+    """Writerへの呼び出しを文書の順番どおりに流すラッパー
+
+    Mermaid画像の取得はバックグラウンドで行うため、取得が終わるまでの間は
+    後続の呼び出しを保留しておき、完了したものから順に書き出す。
+    呼び出しは保留される場合があるため、Writerメソッドの戻り値は返さない (常に None)。
+    """
+    def __init__(self, writer):
+        self._writer = writer
+        self._pending = collections.deque()
+
+    def __getattr__(self, name):
+        method = getattr(self._writer, name)
+
+        def call(*args, **kwargs):
+            self._pending.append((None, method, args, kwargs))
+            self.flush()
+        return call
+
+    def add_mermaid(self, future, mermaid_lines):
+        self._pending.append((future, self._put_mermaid, (mermaid_lines,), {}))
+        self.flush()
+
+    def flush(self, wait=False):
+        while self._pending:
+            future, method, args, kwargs = self._pending[0]
+            if future is not None and not wait and not future.done():
+                return
+            self._pending.popleft()
+            if future is None:
+                method(*args, **kwargs)
+            else:
+                method(future, *args, **kwargs)
+
+    def _put_mermaid(self, future, mermaid_lines):
+        try:
+            image_data = io.BytesIO(future.result())
+            self._writer.add_image(image_data, width_inches=6)
+        except Exception as e:
+            print(f"Mermaid conversion error: {e}")
+            # フォールバックでコードブロックとして出力
+            self._writer.add_code_block(mermaid_lines)
 
+def convert_markdown(md_path, output_path, writer_class=DocxWriter):
+    writer = _OrderedWriter(writer_class())
+    
     in_code_block = False
     in_mermaid_block = False
     mermaid_lines = []
     table_lines = []
     code_buffer = [] # コードブロック用バッファ
+    mermaid_futures = {} # 同じ図の重複取得を防ぐ (コード -> Future)
     
-    for line in lines:
-        # strip() してしまうとコード内のインデントが消えるため、
-        # コンテンツ用(raw_line)と判定用(stripped_line)を分ける
-        raw_line = line.rstrip('\r\n') 
-        stripped_line = raw_line.strip()
+    # ファイル全体をリストに読み込まず、1行ずつ処理する
+    # 末尾が改行で終わっていない場合にバッファ（表など）がフラッシュされない問題への対策として、
+    # 最後に空行を1つ流すことで、ループの最後でelseブロック（フラッシュ処理）に入るようにする
+    # Mermaid画像は見つけた時点で取得を開始し、解析と並行して待つ
+    with open(md_path, 'r', encoding='utf-8') as f, ThreadPoolExecutor(max_workers=4) as mermaid_pool:
+        line_iter = itertools.chain((l.rstrip('\r\n') for l in f), ('',))
+
+        for raw_line in line_iter:
+            # strip() してしまうとコード内のインデントが消えるため、
+            # コンテンツ用(raw_line)と判定用(stripped_line)を分ける
+            stripped_line = raw_line.strip()
         
-        # コードブロックの処理
-        if stripped_line.startswith('```'):
-            if stripped_line.startswith('```mermaid'):
-                in_mermaid_block = True
-                mermaid_lines = []
+            # コードブロックの処理
+            if stripped_line.startswith('```'):
+                if stripped_line.startswith('```mermaid'):
+                    in_mermaid_block = True
+                    mermaid_lines = []
+                    continue
+            
+                if in_mermaid_block:
+                    in_mermaid_block = False
+                    if mermaid_lines:
+                        mm_key = '\n'.join(mermaid_lines)
+                        future = mermaid_futures.get(mm_key)
+                        if future is None:
+                            future = mermaid_pool.submit(fetch_mermaid_png, mermaid_lines)
+                            mermaid_futures[mm_key] = future
+                        writer.add_mermaid(future, mermaid_lines)
+                    continue
+
+                if in_code_block:
+                    # コードブロック終了：バッファを書き出し
+                    writer.add_code_block(code_buffer)
+                    code_buffer = []
+                    in_code_block = False
+                else:
+                    # コードブロック開始
+                    in_code_block = True
                 continue
             
             if in_mermaid_block:
-                in_mermaid_block = False
-                if mermaid_lines:
-                    try:
-                        mm_code = '\n'.join(mermaid_lines)
-                        mm_bytes = mm_code.encode('utf8')
-                        mm_compressed = zlib.compress(mm_bytes)
-                        mm_b64 = base64.urlsafe_b64encode(mm_compressed).decode('ascii')
-                        url = f"https://kroki.io/mermaid/png/{mm_b64}"
-                        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                        with urllib.request.urlopen(req) as response:
-                            image_data = io.BytesIO(response.read())
-                            writer.add_image(image_data, width_inches=6)
-                    except Exception as e:
-                        print(f"Mermaid conversion error: {e}")
-                        # フォールバックでコードブロックとして出力
-                        writer.add_code_block(mermaid_lines)
+                mermaid_lines.append(raw_line)
                 continue
-
+            
             if in_code_block:
-                # コードブロック終了：バッファを書き出し
-                writer.add_code_block(code_buffer)
-                code_buffer = []
-                in_code_block = False
+                # バッファに追加
+                code_buffer.append(raw_line)
+                continue
+
+            # 表の処理
+            if stripped_line.startswith('|'):
+                table_lines.append(stripped_line)
+                continue
             else:
-                # コードブロック開始
-                in_code_block = True
-            continue
-            
-        if in_mermaid_block:
-            mermaid_lines.append(raw_line)
-            continue
-            
-        if in_code_block:
-            # バッファに追加
-            code_buffer.append(raw_line)
-            continue
+                if table_lines:
+                    wb_rows = [r for r in table_lines if '---' not in r]
+                    if wb_rows:
+                        # 各行の分割は1回だけ行い、列数の算出にも使い回す
+                        split_rows = [[c.strip() for c in r.split('|') if c] for r in wb_rows]
+                        cols = len(split_rows[0])
+                        data = []
+                        for row_cells in split_rows:
+                            # Pad with empty strings if necessary
+                            while len(row_cells) < cols: row_cells.append("")
+                            data.append(row_cells[:cols])
+                        writer.add_table(len(wb_rows), cols, data)
+                    table_lines = []
+
+            if not stripped_line:
+                continue
 
-        # 表の処理
-        if stripped_line.startswith('|'):
-            table_lines.append(stripped_line)
-            continue
-        else:
-            if table_lines:
-                wb_rows = [r for r in table_lines if '---' not in r]
-                if wb_rows:
-                    cols = len([c for c in wb_rows[0].split('|') if c])
-                    data = []
-                    for row_text in wb_rows:
-                        row_cells = [c.strip() for c in row_text.split('|') if c]
-                        # Pad with empty strings if necessary
-                        while len(row_cells) < cols: row_cells.append("")
-                        data.append(row_cells[:cols])
-                    writer.add_table(len(wb_rows), cols, data)
-                table_lines = []
-
-        if not stripped_line:
-            continue
+            # 大半を占める通常の段落は先頭1文字だけで判定して正規表現を通さない
+            c0 = stripped_line[0]
+            if c0 not in _BLOCK_FIRST_CHARS and not c0.isdigit():
+                writer.add_paragraph(stripped_line)
+                continue
 
-        # 見出し
-        if stripped_line.startswith('# '):
-            writer.add_heading(stripped_line[2:], 1)
-        elif stripped_line.startswith('## '):
-            writer.add_heading(stripped_line[3:], 2)
-        elif stripped_line.startswith('### '):
-            writer.add_heading(stripped_line[4:], 3)
-        elif stripped_line.startswith('#### '):
-            writer.add_heading(stripped_line[5:], 4)
+            m = _BLOCK_RE.match(stripped_line)
+            kind = m.lastgroup if m else None
+
+            # 見出し
+            if kind == 'h':
+                level = len(m.group('h'))
+                writer.add_heading(stripped_line[level + 1:], level)
         
-        # リスト
-        elif stripped_line.startswith('* ') or stripped_line.startswith('- '):
-            writer.add_paragraph(stripped_line[2:], style='List Bullet')
-        elif stripped_line[0].isdigit() and stripped_line[1:3] == '. ':
-            writer.add_paragraph(stripped_line[3:], style='List Number')
+            # リスト
+            elif kind == 'ul':
+                writer.add_paragraph(stripped_line[2:], style='List Bullet')
+            elif c0.isdigit() and stripped_line[1:3] == '. ':
+                writer.add_paragraph(stripped_line[3:], style='List Number')
             
-        # 引用
-        elif stripped_line.startswith('> '):
-            writer.add_quote(stripped_line[2:])
+            # 引用
+            elif kind == 'q':
+                writer.add_quote(stripped_line[2:])
             
-        # 画像
-        elif stripped_line.startswith('![') and '](' in stripped_line and stripped_line.endswith(')'):
-            match = re.match(r'!\[(.*?)\]\((.*?)\)', stripped_line)
-            if match:
-                image_path = match.group(2)
-                if not os.path.isabs(image_path):
-                    image_path = os.path.join(os.path.dirname(md_path), image_path)
+            # 画像
+            elif kind == 'img' and '](' in stripped_line and stripped_line.endswith(')'):
+                match = _IMAGE_RE.match(stripped_line)
+                if match:
+                    image_path = match.group(2)
+                    if not os.path.isabs(image_path):
+                        image_path = os.path.join(os.path.dirname(md_path), image_path)
                 
-                if os.path.exists(image_path):
-                    writer.add_image(image_path, width_inches=5)
-                else:
-                    writer.add_paragraph(f"[画像が見つかりません: {image_path}]")
+                    if os.path.exists(image_path):
+                        writer.add_image(image_path, width_inches=5)
+                    else:
+                        writer.add_paragraph(f"[画像が見つかりません: {image_path}]")
 
-        # 通常の段落
-        else:
-            writer.add_paragraph(stripped_line)
+            # 通常の段落
+            else:
+                writer.add_paragraph(stripped_line)
 
+    # 取得待ちのMermaid画像と、その後ろに保留されている要素を書き出す
+    writer.flush(wait=True)
     writer.save(output_path)
 
 if __name__ == "__main__":